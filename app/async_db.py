@@ -0,0 +1,30 @@
+"""Async database engine and session management
+
+Async endpoints run directly on the event loop instead of FastAPI's bounded
+threadpool, so concurrent I/O-bound requests are not capped by (or paying
+context switches into) the ~40 worker threads.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Same SQLite file as the sync engine, driven by aiosqlite
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./workout.db"
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=20,
+    max_overflow=10
+)
+
+# expire_on_commit=False keeps attributes readable after commit without
+# triggering implicit (and under asyncio, forbidden) lazy refresh IO
+async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session.
+    Yields a session and ensures it's closed after use.
+    """
+    async with async_session() as db:
+        yield db
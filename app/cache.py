@@ -0,0 +1,104 @@
+"""Optional Redis-backed caching for hot workout reads
+
+Clients poll the session detail and workout list endpoints while a workout
+is active; a short-TTL Redis cache lets those hits skip the database
+round-trip entirely. The cache is enabled by setting REDIS_URL — without it
+(or without the redis package) every helper is a cheap no-op, and Redis
+errors degrade to cache misses rather than failing the request.
+
+Cached values are the serialized data payloads, not whole envelopes, so
+responses keep their own request_id/timestamp metadata. List variants are
+stored as fields of one hash per user, so a single DELETE invalidates every
+cached page/filter combination for that user.
+"""
+import os
+import orjson
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Short TTL: workout state changes quickly while a session is active
+CACHE_TTL = 30
+
+_client = None
+
+
+def _session_key(session_id: int) -> str:
+    return f"ws:{session_id}"
+
+
+def _list_key(user_id: int) -> str:
+    return f"ws:list:{user_id}"
+
+
+async def init_cache():
+    """Connect the cache client if REDIS_URL is configured"""
+    global _client
+    if aioredis is not None and REDIS_URL:
+        _client = aioredis.from_url(REDIS_URL)
+
+
+async def close_cache():
+    """Close the cache client on shutdown"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_session(session_id: int):
+    """Cached session payload, or None on miss/disabled/error"""
+    if _client is None:
+        return None
+    try:
+        raw = await _client.get(_session_key(session_id))
+    except Exception:
+        return None
+    return orjson.loads(raw) if raw else None
+
+
+async def set_session(session_id: int, data: dict):
+    """Cache a session payload with the standard TTL"""
+    if _client is None:
+        return
+    try:
+        await _client.set(_session_key(session_id), orjson.dumps(data), ex=CACHE_TTL)
+    except Exception:
+        pass
+
+
+async def get_user_list(user_id: int, variant: str):
+    """Cached list payload for one query variant, or None"""
+    if _client is None:
+        return None
+    try:
+        raw = await _client.hget(_list_key(user_id), variant)
+    except Exception:
+        return None
+    return orjson.loads(raw) if raw else None
+
+
+async def set_user_list(user_id: int, variant: str, payload: dict):
+    """Cache a list payload under its query variant"""
+    if _client is None:
+        return
+    key = _list_key(user_id)
+    try:
+        await _client.hset(key, variant, orjson.dumps(payload))
+        await _client.expire(key, CACHE_TTL)
+    except Exception:
+        pass
+
+
+async def invalidate_session(session_id: int, user_id: int):
+    """Drop the cached entries a write to this session makes stale"""
+    if _client is None:
+        return
+    try:
+        await _client.delete(_session_key(session_id), _list_key(user_id))
+    except Exception:
+        pass
@@ -1,43 +1,150 @@
 """CRUD operations for database models"""
+import base64
+import binascii
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, asc
+from sqlalchemy.orm import Session, joinedload, selectinload, raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, asc, tuple_, case, literal, DateTime, func, select, true
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app import models
+from app.database import SessionLocal
+from app.async_db import async_session
 from app.exceptions import (
     UserNotFoundException,
     WorkoutSessionNotFoundException,
     ActiveSessionExistsException,
     SessionNotActiveException,
-    ExerciseNotLoggedException
+    ExerciseNotLoggedException,
+    ValidationException
 )
 
 
 # ============= Helper Functions =============
 
+def _encode_cursor(sort_value, row_id: int) -> str:
+    """
+    Encode a keyset pagination cursor from the sort key of the last row.
+
+    The cursor is an opaque base64 string wrapping "<sort_value>|<id>".
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = f"{sort_value}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str, sort_column) -> tuple:
+    """
+    Decode a keyset pagination cursor back into (sort_value, row_id).
+
+    Raises ValidationException if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        sort_value, _, row_id = raw.rpartition("|")
+        if isinstance(sort_column.type, DateTime):
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValidationException("Invalid pagination cursor", field="cursor")
+
+
+def _keyset_filter(stmt, sort_column, id_column, order: str, cursor: str):
+    """
+    Apply the keyset predicate for a cursor: rows strictly after the cursor
+    position in (sort_column, id) order. This is a single index range scan,
+    independent of page depth (unlike OFFSET which scans and discards rows).
+    """
+    sort_value, row_id = _decode_cursor(cursor, sort_column)
+    key = tuple_(sort_column, id_column)
+    if order == "asc":
+        return stmt.where(key > (sort_value, row_id))
+    return stmt.where(key < (sort_value, row_id))
+
+
+_COUNT_THRESHOLD = 10_000
+
+# Batch size for streamed list queries (yield_per); caps resident ORM rows
+_STREAM_BATCH = 50
+
+# Whitelists of client-selectable sort columns. A dict lookup on pre-bound
+# column objects replaces the per-request getattr reflection and keeps
+# arbitrary model attributes (relationships included) out of ORDER BY.
+_USER_SORT_COLUMNS = {
+    "created_at": models.User.created_at,
+    "name": models.User.name,
+}
+
+_SESSION_SORT_COLUMNS = {
+    "started_at": models.WorkoutSession.started_at,
+    "ended_at": models.WorkoutSession.ended_at,
+}
+
+
+def _dialect_insert(db):
+    """INSERT construct with ON CONFLICT support for the active dialect"""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert
+    return sqlite_insert
+
+
+def _estimate_or_count(db: Session, stmt, threshold: int = _COUNT_THRESHOLD) -> tuple[bool, int]:
+    """
+    Count the rows of a select(), capping the scan at `threshold` rows.
+
+    A full COUNT(*) scales linearly with table size and often dominates list
+    request cost. Instead, count over a probe subquery limited to threshold+1
+    rows: if the probe saturates, report (False, threshold) meaning "at least
+    threshold rows"; otherwise the count is exact and returned as (True, n).
+    """
+    probe = stmt.order_by(None).limit(threshold + 1).subquery()
+    value = db.execute(select(func.count()).select_from(probe)).scalar()
+    if value > threshold:
+        return False, threshold
+    return True, value
+
+
+async def _estimate_or_count_async(db: AsyncSession, stmt, threshold: int = _COUNT_THRESHOLD) -> tuple[bool, int]:
+    """Async twin of _estimate_or_count (same probe-subquery capping)"""
+    probe = stmt.order_by(None).limit(threshold + 1).subquery()
+    value = (await db.execute(select(func.count()).select_from(probe))).scalar()
+    if value > threshold:
+        return False, threshold
+    return True, value
+
+
+def _apply_sort(stmt, sort_column, id_column, order: str):
+    """Order by (sort_column, id) so the sort key is unique and cursor-safe"""
+    if order == "asc":
+        return stmt.order_by(sort_column.asc(), id_column.asc())
+    return stmt.order_by(sort_column.desc(), id_column.desc())
+
+
 def calculate_next_reps(assigned_reps: int, completed_reps: int) -> int:
     """
     Calculate next recommended reps based on performance
-    
+
     Rules:
     - If completed >= assigned: next = current + 2
     - If completed < assigned: next = current - 1
     - Minimum reps = 1
-    
+
+    The rules collapse to the branchless expression
+    ``assigned + 2 - 3 * (completed < assigned)``, which also translates
+    directly to SQL/array form for bulk recomputation.
+
     Args:
         assigned_reps: Target reps
         completed_reps: Actual reps completed
-    
+
     Returns:
         Next recommended reps (minimum 1)
     """
-    if completed_reps >= assigned_reps:
-        next_reps = assigned_reps + 2
-    else:
-        next_reps = assigned_reps - 1
-    
-    return max(1, next_reps)
+    return max(1, assigned_reps + 2 - 3 * (completed_reps < assigned_reps))
 
 
 # ============= User CRUD =============
@@ -52,8 +159,14 @@ def create_user(db: Session, name: str, email: Optional[str] = None) -> models.U
 
 
 def get_user(db: Session, user_id: int) -> models.User:
-    """Get user by ID, raises exception if not found"""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    """
+    Get user by ID, raises exception if not found
+
+    Uses Session.get() rather than a filtered query: it checks the identity
+    map first (no SQL at all on a repeat lookup within the request) and runs
+    a cached pre-compiled statement otherwise.
+    """
+    user = db.get(models.User, user_id)
     if not user:
         raise UserNotFoundException(user_id)
     return user
@@ -64,85 +177,220 @@ def get_users(
     skip: int = 0,
     limit: int = 20,
     sort_by: str = "created_at",
-    order: str = "desc"
-) -> tuple[List[models.User], int]:
-    """Get list of users with pagination"""
-    query = db.query(models.User)
-    
-    # Get total count
-    total = query.count()
-    
-    # Apply sorting
-    sort_column = getattr(models.User, sort_by, models.User.created_at)
-    if order == "asc":
-        query = query.order_by(asc(sort_column))
-    else:
-        query = query.order_by(desc(sort_column))
-    
-    # Apply pagination
-    users = query.offset(skip).limit(limit).all()
-    
-    return users, total
+    order: str = "desc",
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> tuple[List[tuple[models.User, int]], Optional[int], Optional[str]]:
+    """
+    Get list of users with their workout counts, paginated
+
+    The workout count is aggregated in the same query (outer join + group by)
+    rather than loading each user's sessions lazily, which would issue one
+    SELECT per user (N+1).
+
+    Supports two modes:
+    - Keyset (cursor): pass the next_cursor from the previous page; each page
+      is a single index range scan regardless of depth. No total is computed.
+    - Offset (skip/limit): fallback mode for page-numbered clients.
+
+    The total is only computed when include_total is set (it requires an
+    extra scan), and is capped at _COUNT_THRESHOLD for very large tables.
+
+    Returns:
+        (rows, total, next_cursor) — rows are (User, workout_count) pairs,
+        total is None unless requested, next_cursor is None on the last page.
+    """
+    # raiseload('*') turns any accidental lazy load in router formatting code
+    # into a loud error instead of a silent per-row query (N+1 regression)
+    stmt = select(
+        models.User,
+        func.count(models.WorkoutSession.id).label("workout_count")
+    ).outerjoin(models.User.workout_sessions).group_by(
+        models.User.id
+    ).options(raiseload("*"))
+    sort_column = _USER_SORT_COLUMNS.get(sort_by, models.User.created_at)
+
+    total = None
+    if cursor is not None:
+        stmt = _keyset_filter(stmt, sort_column, models.User.id, order, cursor)
+    elif include_total:
+        _, total = _estimate_or_count(db, stmt)
+
+    # Apply sorting and pagination; fetch one extra row to detect the next page
+    stmt = _apply_sort(stmt, sort_column, models.User.id, order)
+    if cursor is None and skip:
+        stmt = stmt.offset(skip)
+    rows = db.execute(stmt.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_user = rows[-1][0]
+        next_cursor = _encode_cursor(getattr(last_user, sort_column.key), last_user.id)
+
+    return rows, total, next_cursor
+
+
+def iter_users(
+    db: Session,
+    skip: int = 0,
+    limit: int = 20,
+    sort_by: str = "created_at",
+    order: str = "desc",
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> tuple:
+    """
+    Stream (User, workout_count) rows for a page instead of materializing it
+
+    Same query and pagination semantics as get_users, but rows are pulled
+    through a server-side cursor (yield_per batches of _STREAM_BATCH), so
+    peak memory is one batch regardless of the requested limit and callers
+    can serialize rows as they arrive.
+
+    A malformed cursor raises immediately (before any row is produced); the
+    row iterator opens its own session because request-scoped sessions are
+    closed before a streaming response body runs.
+
+    Returns:
+        (rows, page_state, total) — rows yields (User, workout_count);
+        page_state["next_cursor"] is populated once the iterator is
+        exhausted (pagination meta is emitted after the data anyway);
+        total follows the include_total rules of get_users.
+    """
+    stmt = select(
+        models.User,
+        func.count(models.WorkoutSession.id).label("workout_count")
+    ).outerjoin(models.User.workout_sessions).group_by(
+        models.User.id
+    ).options(raiseload("*"))
+    sort_column = _USER_SORT_COLUMNS.get(sort_by, models.User.created_at)
+
+    total = None
+    if cursor is not None:
+        stmt = _keyset_filter(stmt, sort_column, models.User.id, order, cursor)
+    elif include_total:
+        _, total = _estimate_or_count(db, stmt)
+
+    stmt = _apply_sort(stmt, sort_column, models.User.id, order)
+    if cursor is None and skip:
+        stmt = stmt.offset(skip)
+    stmt = stmt.limit(limit + 1).execution_options(yield_per=_STREAM_BATCH)
+
+    page_state = {"next_cursor": None}
+
+    def rows():
+        stream_db = SessionLocal()
+        try:
+            emitted = 0
+            last_user = None
+            for row in stream_db.execute(stmt):
+                if emitted == limit:
+                    # The extra probe row exists — record the cursor of the
+                    # last emitted row and stop without yielding it
+                    page_state["next_cursor"] = _encode_cursor(
+                        getattr(last_user, sort_column.key), last_user.id
+                    )
+                    break
+                last_user = row[0]
+                emitted += 1
+                yield row
+        finally:
+            stream_db.close()
+
+    return rows(), page_state, total
 
 
 def get_user_stats(db: Session, user_id: int) -> dict:
-    """Get user statistics"""
-    user = get_user(db, user_id)
-    
-    total_workouts = db.query(models.WorkoutSession).filter(
-        models.WorkoutSession.user_id == user_id
-    ).count()
-    
-    total_exercises = db.query(models.Exercise).join(models.WorkoutSession).filter(
-        models.WorkoutSession.user_id == user_id
-    ).count()
-    
-    active_sessions = db.query(models.WorkoutSession).filter(
+    """
+    Get user statistics in a single round-trip
+
+    The three counts and the current recommendation are fetched as
+    correlated scalar subqueries on one SELECT instead of five separate
+    queries — each round-trip saved is mostly network/IO latency.
+    """
+    total_workouts_sq = select(func.count()).select_from(
+        models.WorkoutSession
+    ).where(models.WorkoutSession.user_id == user_id).scalar_subquery()
+
+    total_exercises_sq = select(func.count()).select_from(
+        models.Exercise
+    ).join(
+        models.WorkoutSession, models.Exercise.session_id == models.WorkoutSession.id
+    ).where(models.WorkoutSession.user_id == user_id).scalar_subquery()
+
+    active_sessions_sq = select(func.count()).select_from(
+        models.WorkoutSession
+    ).where(
         models.WorkoutSession.user_id == user_id,
         models.WorkoutSession.is_active == True
-    ).count()
-    
-    # Get current recommendation
-    recommendation = db.query(models.WorkoutRecommendation).filter(
-        models.WorkoutRecommendation.user_id == user_id
-    ).first()
-    
-    current_recommended_reps = recommendation.next_recommended_reps if recommendation else 10
-    
+    ).scalar_subquery()
+
+    stmt = select(
+        total_workouts_sq.label("total_workouts"),
+        total_exercises_sq.label("total_exercises"),
+        active_sessions_sq.label("active_sessions"),
+        models.WorkoutRecommendation.next_recommended_reps
+    ).select_from(models.User).outerjoin(
+        models.WorkoutRecommendation,
+        models.WorkoutRecommendation.user_id == models.User.id
+    ).where(models.User.id == user_id)
+
+    row = db.execute(stmt).one_or_none()
+    if row is None:
+        raise UserNotFoundException(user_id)
+
     return {
-        "total_workouts": total_workouts,
-        "total_exercises": total_exercises,
-        "active_sessions": active_sessions,
-        "current_recommended_reps": current_recommended_reps
+        "total_workouts": row.total_workouts,
+        "total_exercises": row.total_exercises,
+        "active_sessions": row.active_sessions,
+        "current_recommended_reps": (
+            row.next_recommended_reps if row.next_recommended_reps is not None else 10
+        )
     }
 
 
 # ============= Workout Session CRUD =============
+#
+# Workout session operations are async (AsyncSession): the workout endpoints
+# run on the event loop rather than the threadpool, so their DB calls must
+# await instead of block.
 
-def create_workout_session(
-    db: Session,
+async def create_workout_session(
+    db: AsyncSession,
     user_id: int,
     assigned_reps: int,
     exercise_name: str = "Push-ups"
 ) -> models.WorkoutSession:
-    """Create a new workout session"""
+    """
+    Create a new workout session
+
+    The "one active session per user" invariant is enforced by the partial
+    unique index uq_ws_one_active rather than a pre-insert SELECT — that
+    check was both an extra round-trip and a check-then-insert race under
+    concurrency. A violation surfaces as IntegrityError on flush.
+    """
     # Verify user exists
-    user = get_user(db, user_id)
-    
-    # Check for active session
-    active_session = db.query(models.WorkoutSession).filter(
-        models.WorkoutSession.user_id == user_id,
-        models.WorkoutSession.is_active == True
-    ).first()
-    
-    if active_session:
-        raise ActiveSessionExistsException(user_id, active_session.id)
-    
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise UserNotFoundException(user_id)
+
     # Create session
     db_session = models.WorkoutSession(user_id=user_id)
     db.add(db_session)
-    db.flush()  # Get session ID without committing
-    
+    try:
+        await db.flush()  # Get session ID without committing
+    except IntegrityError:
+        await db.rollback()
+        # Only on the conflict path do we pay for the lookup of the offender
+        active_id = (await db.execute(
+            select(models.WorkoutSession.id).where(
+                models.WorkoutSession.user_id == user_id,
+                models.WorkoutSession.is_active == True
+            )
+        )).scalar()
+        raise ActiveSessionExistsException(user_id, active_id)
+
     # Create exercise
     db_exercise = models.Exercise(
         session_id=db_session.id,
@@ -150,192 +398,425 @@ def create_workout_session(
         exercise_name=exercise_name
     )
     db.add(db_exercise)
-    
-    db.commit()
-    db.refresh(db_session)
-    
+
+    await db.commit()
+    # Load the exercise relationship explicitly; implicit lazy loading is
+    # not available under asyncio
+    await db.refresh(db_session, ["exercise"])
+
     return db_session
 
 
-def get_workout_session(db: Session, session_id: int) -> models.WorkoutSession:
-    """Get workout session by ID"""
-    session = db.query(models.WorkoutSession).options(
-        joinedload(models.WorkoutSession.exercise),
-        joinedload(models.WorkoutSession.user)
-    ).filter(models.WorkoutSession.id == session_id).first()
-    
+async def get_workout_session(db: AsyncSession, session_id: int) -> models.WorkoutSession:
+    """Get workout session by ID (primary-key lookup via Session.get)"""
+    session = await db.get(
+        models.WorkoutSession,
+        session_id,
+        options=[
+            joinedload(models.WorkoutSession.exercise),
+            joinedload(models.WorkoutSession.user)
+        ]
+    )
+
     if not session:
         raise WorkoutSessionNotFoundException(session_id)
-    
+
     return session
 
 
-def get_user_workout_sessions(
-    db: Session,
+async def get_user_workout_sessions(
+    db: AsyncSession,
     user_id: int,
     status: str = "all",
     skip: int = 0,
     limit: int = 20,
     sort_by: str = "started_at",
-    order: str = "desc"
-) -> tuple[List[models.WorkoutSession], int]:
-    """Get workout sessions for a user"""
+    order: str = "desc",
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> tuple[List[models.WorkoutSession], Optional[int], Optional[str]]:
+    """
+    Get workout sessions for a user
+
+    Supports keyset (cursor) and offset pagination, with an opt-in
+    threshold-capped total — see get_users.
+
+    Returns:
+        (sessions, total, next_cursor) — total is None unless requested,
+        next_cursor is None on the last page.
+    """
     # Verify user exists
-    get_user(db, user_id)
-    
-    query = db.query(models.WorkoutSession).options(
-        joinedload(models.WorkoutSession.exercise)
-    ).filter(models.WorkoutSession.user_id == user_id)
-    
+    if not await db.get(models.User, user_id):
+        raise UserNotFoundException(user_id)
+
+    # selectinload instead of joinedload: for list fetches a join duplicates
+    # the parent row per child, while selectinload issues one extra IN query
+    # with no row inflation. raiseload('*') makes any other relationship
+    # access fail loudly instead of lazy-loading per row.
+    stmt = select(models.WorkoutSession).options(
+        selectinload(models.WorkoutSession.exercise),
+        raiseload("*")
+    ).where(models.WorkoutSession.user_id == user_id)
+
     # Filter by status
     if status == "active":
-        query = query.filter(models.WorkoutSession.is_active == True)
+        stmt = stmt.where(models.WorkoutSession.is_active == True)
     elif status == "completed":
-        query = query.filter(models.WorkoutSession.is_active == False)
-    
-    # Get total count
-    total = query.count()
-    
-    # Apply sorting
-    sort_column = getattr(models.WorkoutSession, sort_by, models.WorkoutSession.started_at)
-    if order == "asc":
-        query = query.order_by(asc(sort_column))
-    else:
-        query = query.order_by(desc(sort_column))
-    
-    # Apply pagination
-    sessions = query.offset(skip).limit(limit).all()
-    
-    return sessions, total
+        stmt = stmt.where(models.WorkoutSession.is_active == False)
 
+    sort_column = _SESSION_SORT_COLUMNS.get(sort_by, models.WorkoutSession.started_at)
 
-def log_exercise(db: Session, session_id: int, completed_reps: int) -> models.WorkoutSession:
+    total = None
+    if cursor is not None:
+        stmt = _keyset_filter(stmt, sort_column, models.WorkoutSession.id, order, cursor)
+    elif include_total:
+        _, total = await _estimate_or_count_async(db, stmt)
+
+    # Apply sorting and pagination; fetch one extra row to detect the next page
+    stmt = _apply_sort(stmt, sort_column, models.WorkoutSession.id, order)
+    if cursor is None and skip:
+        stmt = stmt.offset(skip)
+    sessions = (await db.execute(stmt.limit(limit + 1))).scalars().all()
+
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        last = sessions[-1]
+        next_cursor = _encode_cursor(getattr(last, sort_column.key), last.id)
+
+    return sessions, total, next_cursor
+
+
+async def iter_user_workout_sessions(
+    db: AsyncSession,
+    user_id: int,
+    status: str = "all",
+    skip: int = 0,
+    limit: int = 20,
+    sort_by: str = "started_at",
+    order: str = "desc",
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> tuple:
+    """
+    Stream a user's workout sessions instead of materializing the page
+
+    Async counterpart of iter_users for workout sessions: same query and
+    pagination semantics as get_user_workout_sessions, but rows arrive
+    through a streaming cursor in yield_per batches, so peak memory stays
+    at one batch for any requested limit.
+
+    Missing users and malformed cursors raise before any row is produced;
+    the row iterator opens its own session because request-scoped sessions
+    are closed before a streaming response body runs.
+
+    Returns:
+        (rows, page_state, total) — rows is an async iterator of sessions;
+        page_state["next_cursor"] is populated once it is exhausted; total
+        follows the include_total rules of get_users.
+    """
+    # Verify user exists
+    if not await db.get(models.User, user_id):
+        raise UserNotFoundException(user_id)
+
+    stmt = select(models.WorkoutSession).options(
+        selectinload(models.WorkoutSession.exercise),
+        raiseload("*")
+    ).where(models.WorkoutSession.user_id == user_id)
+
+    if status == "active":
+        stmt = stmt.where(models.WorkoutSession.is_active == True)
+    elif status == "completed":
+        stmt = stmt.where(models.WorkoutSession.is_active == False)
+
+    sort_column = _SESSION_SORT_COLUMNS.get(sort_by, models.WorkoutSession.started_at)
+
+    total = None
+    if cursor is not None:
+        stmt = _keyset_filter(stmt, sort_column, models.WorkoutSession.id, order, cursor)
+    elif include_total:
+        _, total = await _estimate_or_count_async(db, stmt)
+
+    stmt = _apply_sort(stmt, sort_column, models.WorkoutSession.id, order)
+    if cursor is None and skip:
+        stmt = stmt.offset(skip)
+    stmt = stmt.limit(limit + 1).execution_options(yield_per=_STREAM_BATCH)
+
+    page_state = {"next_cursor": None}
+
+    async def rows():
+        async with async_session() as stream_db:
+            emitted = 0
+            last = None
+            result = await stream_db.stream_scalars(stmt)
+            async for session in result:
+                if emitted == limit:
+                    # The extra probe row exists — record the cursor of the
+                    # last emitted row and stop without yielding it
+                    page_state["next_cursor"] = _encode_cursor(
+                        getattr(last, sort_column.key), last.id
+                    )
+                    break
+                last = session
+                emitted += 1
+                yield session
+
+    return rows(), page_state, total
+
+
+async def log_exercise(db: AsyncSession, session_id: int, completed_reps: int) -> models.WorkoutSession:
     """Log exercise results for a workout session"""
-    session = get_workout_session(db, session_id)
-    
+    session = await get_workout_session(db, session_id)
+
     if not session.is_active:
         raise SessionNotActiveException(session_id)
-    
+
     # Update exercise
     session.exercise.completed_reps = completed_reps
-    
-    db.commit()
-    db.refresh(session)
-    
+
+    await db.commit()
+
     return session
 
 
-def end_workout_session(db: Session, session_id: int) -> tuple[models.WorkoutSession, int]:
+async def end_workout_session(db: AsyncSession, session_id: int) -> tuple[models.WorkoutSession, int]:
     """End a workout session and calculate recommendation"""
-    session = get_workout_session(db, session_id)
-    
+    session = await get_workout_session(db, session_id)
+
     if not session.is_active:
         raise SessionNotActiveException(session_id)
-    
+
     # Check if exercise was logged
     if session.exercise.completed_reps is None:
         raise ExerciseNotLoggedException(session_id)
-    
+
     # End session
     session.ended_at = datetime.utcnow()
     session.is_active = False
-    
+
     # Calculate next recommendation
     next_reps = calculate_next_reps(
         session.exercise.assigned_reps,
         session.exercise.completed_reps
     )
-    
-    # Update or create recommendation
-    recommendation = db.query(models.WorkoutRecommendation).filter(
-        models.WorkoutRecommendation.user_id == session.user_id
-    ).first()
-    
-    if recommendation:
-        recommendation.next_recommended_reps = next_reps
-        recommendation.updated_at = datetime.utcnow()
-    else:
-        recommendation = models.WorkoutRecommendation(
-            user_id=session.user_id,
-            next_recommended_reps=next_reps
-        )
-        db.add(recommendation)
-    
-    db.commit()
-    db.refresh(session)
-    
+
+    # Upsert the recommendation in one statement (no SELECT-then-branch):
+    # INSERT ... ON CONFLICT (user_id) DO UPDATE
+    now = datetime.utcnow()
+    stmt = _dialect_insert(db)(models.WorkoutRecommendation).values(
+        user_id=session.user_id,
+        next_recommended_reps=next_reps,
+        updated_at=now
+    ).on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"next_recommended_reps": next_reps, "updated_at": now}
+    )
+    await db.execute(stmt)
+
+    await db.commit()
+
+    return session, next_reps
+
+
+async def complete_workout_session(
+    db: AsyncSession,
+    session_id: int,
+    completed_reps: int
+) -> tuple[models.WorkoutSession, int]:
+    """
+    Log final reps and end the session in one transaction
+
+    The common "finish workout" flow was two requests (log, then end) and
+    two commits; this does both against one loaded session row with a
+    single COMMIT. Returns (session, next_recommended_reps).
+    """
+    session = await get_workout_session(db, session_id)
+
+    if not session.is_active:
+        raise SessionNotActiveException(session_id)
+
+    # Log the final reps
+    session.exercise.completed_reps = completed_reps
+
+    # End session
+    session.ended_at = datetime.utcnow()
+    session.is_active = False
+
+    # Calculate next recommendation
+    next_reps = calculate_next_reps(
+        session.exercise.assigned_reps,
+        session.exercise.completed_reps
+    )
+
+    now = datetime.utcnow()
+    stmt = _dialect_insert(db)(models.WorkoutRecommendation).values(
+        user_id=session.user_id,
+        next_recommended_reps=next_reps,
+        updated_at=now
+    ).on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"next_recommended_reps": next_reps, "updated_at": now}
+    )
+    await db.execute(stmt)
+
+    await db.commit()
+
     return session, next_reps
 
 
+def rebuild_recommendations(db: Session) -> int:
+    """
+    Recompute every user's recommendation from their latest completed session
+
+    Runs as one set-based INSERT ... SELECT ... ON CONFLICT DO UPDATE: a
+    window function ranks each user's completed sessions by ended_at and the
+    newest row per user feeds the upsert, with next reps computed in SQL via
+    the same branchless expression as calculate_next_reps. One round-trip
+    regardless of user count, versus O(users) with the per-user
+    SELECT+UPDATE pattern.
+
+    Returns:
+        Number of recommendation rows written
+    """
+    ranked = select(
+        models.WorkoutSession.user_id,
+        models.Exercise.assigned_reps,
+        models.Exercise.completed_reps,
+        func.row_number().over(
+            partition_by=models.WorkoutSession.user_id,
+            order_by=desc(models.WorkoutSession.ended_at)
+        ).label("rn")
+    ).join(
+        models.Exercise, models.Exercise.session_id == models.WorkoutSession.id
+    ).where(
+        models.WorkoutSession.is_active == False,
+        models.Exercise.completed_reps != None
+    ).subquery("ranked")
+
+    # assigned + 2 - 3 * (completed < assigned), floored at 1
+    raw_next = ranked.c.assigned_reps + 2 - 3 * case(
+        (ranked.c.completed_reps < ranked.c.assigned_reps, 1), else_=0
+    )
+    next_reps = case((raw_next < 1, 1), else_=raw_next)
+
+    latest = select(
+        ranked.c.user_id,
+        next_reps.label("next_recommended_reps"),
+        literal(datetime.utcnow()).label("updated_at")
+    ).where(ranked.c.rn == 1)
+
+    stmt = _dialect_insert(db)(models.WorkoutRecommendation).from_select(
+        ["user_id", "next_recommended_reps", "updated_at"], latest
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            "next_recommended_reps": stmt.excluded.next_recommended_reps,
+            "updated_at": stmt.excluded.updated_at
+        }
+    )
+
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
 # ============= Recommendation CRUD =============
 
 def get_recommendation(db: Session, user_id: int) -> dict:
-    """Get workout recommendation for a user"""
-    # Verify user exists
-    get_user(db, user_id)
-    
-    # Get recommendation
-    recommendation = db.query(models.WorkoutRecommendation).filter(
-        models.WorkoutRecommendation.user_id == user_id
-    ).first()
-    
-    # Get last workout
-    last_session = db.query(models.WorkoutSession).options(
-        joinedload(models.WorkoutSession.exercise)
-    ).filter(
+    """
+    Get workout recommendation for a user
+
+    Everything needed (recommendation row, completed-session count,
+    first/last completed session details) is gathered in a single SELECT:
+    the first/last sessions are LIMIT 1 derived tables outer-joined to the
+    user row and the count is a scalar subquery. This replaces five
+    round-trips (user check, recommendation, last session, count, first
+    session) with one; reason/trend are derived in Python from the row.
+    """
+    completed = select(
+        models.WorkoutSession.id,
+        models.WorkoutSession.started_at,
+        models.WorkoutSession.ended_at,
+        models.Exercise.assigned_reps,
+        models.Exercise.completed_reps
+    ).join(
+        models.Exercise, models.Exercise.session_id == models.WorkoutSession.id
+    ).where(
         models.WorkoutSession.user_id == user_id,
         models.WorkoutSession.is_active == False
-    ).order_by(desc(models.WorkoutSession.ended_at)).first()
-    
-    # Calculate progression
-    completed_sessions = db.query(models.WorkoutSession).filter(
+    )
+
+    last_sq = completed.order_by(desc(models.WorkoutSession.ended_at)).limit(1).subquery("last_ws")
+    first_sq = completed.order_by(asc(models.WorkoutSession.started_at)).limit(1).subquery("first_ws")
+
+    completed_count_sq = select(func.count()).select_from(
+        models.WorkoutSession
+    ).where(
         models.WorkoutSession.user_id == user_id,
         models.WorkoutSession.is_active == False
-    ).count()
-    
-    if recommendation:
-        recommended_reps = recommendation.next_recommended_reps
-    elif last_session and last_session.exercise:
+    ).scalar_subquery()
+
+    stmt = select(
+        models.WorkoutRecommendation.next_recommended_reps,
+        completed_count_sq.label("completed_sessions"),
+        last_sq.c.id.label("last_id"),
+        last_sq.c.assigned_reps.label("last_assigned"),
+        last_sq.c.completed_reps.label("last_completed"),
+        last_sq.c.started_at.label("last_started"),
+        last_sq.c.ended_at.label("last_ended"),
+        first_sq.c.assigned_reps.label("first_assigned")
+    ).select_from(models.User).outerjoin(
+        models.WorkoutRecommendation,
+        models.WorkoutRecommendation.user_id == models.User.id
+    ).outerjoin(last_sq, true()).outerjoin(first_sq, true()).where(
+        models.User.id == user_id
+    )
+
+    row = db.execute(stmt).one_or_none()
+    if row is None:
+        raise UserNotFoundException(user_id)
+
+    if row.next_recommended_reps is not None:
+        recommended_reps = row.next_recommended_reps
+    elif row.last_id is not None:
         # Calculate from last session if no recommendation exists
-        recommended_reps = calculate_next_reps(
-            last_session.exercise.assigned_reps,
-            last_session.exercise.completed_reps
-        )
+        recommended_reps = calculate_next_reps(row.last_assigned, row.last_completed)
     else:
         # Default for new users
         recommended_reps = 10
-    
+
     # Determine reason
-    if last_session and last_session.exercise:
-        if last_session.exercise.completed_reps >= last_session.exercise.assigned_reps:
+    if row.last_id is not None:
+        if row.last_completed >= row.last_assigned:
             reason = "Completed all reps in last session"
             trend = "improving"
         else:
             reason = "Did not complete all reps in last session"
             trend = "adjusting"
+        last_workout = {
+            "session_id": row.last_id,
+            "assigned_reps": row.last_assigned,
+            "completed_reps": row.last_completed,
+            "date": row.last_ended or row.last_started
+        }
     else:
         reason = "Starting recommendation"
         trend = "new"
-    
+        last_workout = None
+
     # Calculate total increase
-    first_session = db.query(models.WorkoutSession).options(
-        joinedload(models.WorkoutSession.exercise)
-    ).filter(
-        models.WorkoutSession.user_id == user_id,
-        models.WorkoutSession.is_active == False
-    ).order_by(asc(models.WorkoutSession.started_at)).first()
-    
     total_increase = 0
-    if first_session and first_session.exercise:
-        total_increase = recommended_reps - first_session.exercise.assigned_reps
-    
+    if row.first_assigned is not None:
+        total_increase = recommended_reps - row.first_assigned
+
     return {
         "recommended_reps": recommended_reps,
         "reason": reason,
-        "last_session": last_session,
+        "last_workout": last_workout,
         "progression": {
             "trend": trend,
             "total_increase": total_increase,
-            "sessions_count": completed_sessions
+            "sessions_count": row.completed_sessions
         }
     }
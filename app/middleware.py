@@ -1,67 +1,126 @@
-"""Middleware for request tracking and error handling"""
-import uuid
+"""Middleware for request tracking and error handling
+
+Both middlewares implement the raw ASGI interface rather than extending
+starlette's BaseHTTPMiddleware, which wraps every request in a fresh anyio
+task group and re-streams the body through a queue — several times the
+overhead of a plain scope/receive/send wrapper.
+"""
+import itertools
+import random
 import time
-from datetime import datetime
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-
-
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """Middleware to add unique request ID to each request"""
-    
-    async def dispatch(self, request: Request, call_next):
-        # Generate unique request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Add request ID to response headers
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        
-        return response
-
-
-class TimingMiddleware(BaseHTTPMiddleware):
-    """Middleware to track request processing time"""
-    
-    async def dispatch(self, request: Request, call_next):
+from fastapi.responses import ORJSONResponse
+
+# Request IDs are a nanosecond time component plus a process-local counter
+# seeded once from the CSPRNG. uuid4() reads 16 bytes from the OS CSPRNG per
+# request; this keeps IDs unique across restarts (time part) and across
+# concurrent requests (counter) without any per-request syscall.
+_req_counter = itertools.count(random.SystemRandom().getrandbits(32))
+
+
+def _generate_request_id() -> str:
+    """Generate a unique hex request ID"""
+    return f"{time.time_ns():x}{next(_req_counter) & 0xffffffff:08x}"
+
+
+# Pre-built success envelope skeleton; create_success_response copies it and
+# patches in the per-request fields
+_SUCCESS_ENVELOPE = {"success": True, "data": None, "errors": None, "meta": None}
+
+
+def _fmt_iso(t: float) -> str:
+    """Format a UNIX timestamp as an ISO-8601 UTC string (e.g. 2026-01-21T14:28:00.123456Z)"""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(t)) + f".{int(t * 1e6) % 1_000_000:06d}Z"
+
+
+class RequestIDMiddleware:
+    """Pure-ASGI middleware that adds a unique request ID to each request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Honor a caller-supplied ID (trace propagation), else generate one.
+        # Always set, so handlers can read request.state.request_id directly
+        # without a defaulted getattr.
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = _generate_request_id()
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_with_request_id(message):
+            # Add request ID to response headers
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append(
+                    (b"x-request-id", request_id.encode())
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
+
+
+class TimingMiddleware:
+    """Pure-ASGI middleware that tracks request processing time"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
-        
-        response = await call_next(request)
-        
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        return response
+        # Stash the formatted timestamp so response builders reuse it instead
+        # of fetching and formatting the time again per response
+        scope.setdefault("state", {})["ts_iso"] = _fmt_iso(start_time)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                process_time = time.time() - start_time
+                message.setdefault("headers", []).append(
+                    (b"x-process-time", str(process_time).encode())
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
 
 
 def create_error_response(
     success: bool,
     errors: list,
     status_code: int,
-    request_id: str = None
-) -> JSONResponse:
+    request_id: str = None,
+    timestamp: str = None
+) -> ORJSONResponse:
     """
     Create standardized error response
-    
+
     Args:
         success: Whether the request was successful
         errors: List of error details
         status_code: HTTP status code
         request_id: Unique request identifier
-    
+        timestamp: Pre-formatted ISO timestamp (defaults to now)
+
     Returns:
-        JSONResponse with standardized error format
+        ORJSONResponse with standardized error format
     """
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status_code,
         content={
             "success": success,
             "data": None,
             "errors": errors,
             "meta": {
-                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "timestamp": timestamp or _fmt_iso(time.time()),
                 "request_id": request_id
             }
         }
@@ -73,41 +132,50 @@ def create_success_response(
     message: str = None,
     links: dict = None,
     meta: dict = None,
-    request_id: str = None
-) -> dict:
+    request_id: str = None,
+    timestamp: str = None,
+    status_code: int = 200,
+    headers: dict = None
+) -> ORJSONResponse:
     """
     Create standardized success response
-    
+
+    Returns a ready ORJSONResponse rather than a dict: FastAPI passes
+    Response objects through untouched, skipping the jsonable_encoder and
+    response-model validation pass that a returned dict would go through.
+
     Args:
         data: Response data
         message: Optional success message
         links: Optional HATEOAS links
         meta: Optional additional metadata
         request_id: Unique request identifier
-    
+        timestamp: Pre-formatted ISO timestamp (defaults to now)
+        status_code: HTTP status code (defaults to 200)
+        headers: Optional extra response headers (e.g. ETag)
+
     Returns:
-        Standardized response dictionary
+        ORJSONResponse with standardized success format
     """
     response_meta = {
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "timestamp": timestamp or _fmt_iso(time.time()),
         "request_id": request_id
     }
-    
+
     # Add additional metadata if provided
     if meta:
         response_meta.update(meta)
-    
-    response = {
-        "success": True,
-        "data": data,
-        "errors": None,
-        "meta": response_meta
-    }
-    
+
+    # Copy the frozen skeleton (a C-level memcpy) instead of rebuilding the
+    # envelope literal key by key on every response
+    response = _SUCCESS_ENVELOPE.copy()
+    response["data"] = data
+    response["meta"] = response_meta
+
     if message:
         response["message"] = message
-    
+
     if links:
         response["links"] = links
-    
-    return response
+
+    return ORJSONResponse(status_code=status_code, content=response, headers=headers)
@@ -1,6 +1,6 @@
 """SQLAlchemy database models"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, CheckConstraint, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -18,6 +18,11 @@ class User(Base):
     workout_sessions = relationship("WorkoutSession", back_populates="user", cascade="all, delete-orphan")
     recommendation = relationship("WorkoutRecommendation", back_populates="user", uselist=False, cascade="all, delete-orphan")
 
+    # Composite index backing keyset pagination on (created_at, id)
+    __table_args__ = (
+        Index("ix_users_created_id", "created_at", "id"),
+    )
+
 
 class WorkoutSession(Base):
     """WorkoutSession model - represents individual workout sessions"""
@@ -33,6 +38,24 @@ class WorkoutSession(Base):
     user = relationship("User", back_populates="workout_sessions")
     exercise = relationship("Exercise", back_populates="session", uselist=False, cascade="all, delete-orphan")
 
+    # Composite indexes matching the actual query predicates:
+    # - (user_id, started_at, id): keyset pagination of a user's sessions
+    # - (user_id, is_active): active-session checks and status-filtered lists
+    # - (user_id, is_active, ended_at DESC): latest-completed-session lookup
+    # The partial unique index enforces "one active session per user" at the
+    # database level, making the invariant race-free under concurrency.
+    __table_args__ = (
+        Index("ix_ws_user_started_id", "user_id", "started_at", "id"),
+        Index("ix_ws_user_active", "user_id", "is_active"),
+        Index("ix_ws_user_active_ended", "user_id", "is_active", text("ended_at DESC")),
+        Index(
+            "uq_ws_one_active", "user_id",
+            unique=True,
+            sqlite_where=text("is_active"),
+            postgresql_where=text("is_active")
+        ),
+    )
+
 
 class Exercise(Base):
     """Exercise model - represents exercises performed in workout sessions"""
@@ -48,6 +71,12 @@ class Exercise(Base):
     # Relationships
     session = relationship("WorkoutSession", back_populates="exercise")
 
+    # Serialization divides by assigned_reps unguarded; the schema already
+    # rejects non-positive values, this keeps legacy/manual inserts honest
+    __table_args__ = (
+        CheckConstraint("assigned_reps > 0", name="ck_exercises_assigned_reps_positive"),
+    )
+
 
 class WorkoutRecommendation(Base):
     """WorkoutRecommendation model - stores next recommended workout for users"""
@@ -1,253 +1,427 @@
-"""Workout session management endpoints"""
-import math
-from datetime import datetime
-from fastapi import APIRouter, Depends, status, Request
-from sqlalchemy.orm import Session
-
-from app.database import get_db
-from app import crud, schemas
-from app.middleware import create_success_response
-
-router = APIRouter(prefix="/api/v1", tags=["workouts"])
-
-
-@router.post("/users/{user_id}/workouts", response_model=dict, status_code=status.HTTP_201_CREATED)
-def start_workout(
-    user_id: int,
-    workout: schemas.WorkoutSessionCreate,
-    request: Request,
-    db: Session = Depends(get_db)
-):
-    """
-    Start a new workout session for a user
-    
-    - **user_id**: User ID
-    - **assigned_reps**: Target number of reps
-    - **exercise_name**: Optional exercise name (default: Push-ups)
-    """
-    db_session = crud.create_workout_session(
-        db,
-        user_id=user_id,
-        assigned_reps=workout.assigned_reps,
-        exercise_name=workout.exercise_name or "Push-ups"
-    )
-    
-    # Format response
-    session_data = {
-        "id": db_session.id,
-        "user_id": db_session.user_id,
-        "started_at": db_session.started_at,
-        "ended_at": db_session.ended_at,
-        "status": "active" if db_session.is_active else "completed",
-        "exercise": {
-            "assigned_reps": db_session.exercise.assigned_reps,
-            "completed_reps": db_session.exercise.completed_reps,
-            "exercise_name": db_session.exercise.exercise_name,
-            "completion_percentage": None
-        }
-    }
-    
-    # Add HATEOAS links
-    links = {
-        "log": f"/api/v1/workouts/{db_session.id}/log",
-        "end": f"/api/v1/workouts/{db_session.id}/end"
-    }
-    
-    return create_success_response(
-        data=session_data,
-        links=links,
-        request_id=getattr(request.state, "request_id", None)
-    )
-
-
-@router.get("/users/{user_id}/workouts", response_model=dict, status_code=status.HTTP_200_OK)
-def list_user_workouts(
-    user_id: int,
-    request: Request,
-    status_filter: str = "all",
-    page: int = 1,
-    limit: int = 20,
-    sort_by: str = "started_at",
-    order: str = "desc",
-    db: Session = Depends(get_db)
-):
-    """
-    Get workout history for a user
-    
-    - **user_id**: User ID
-    - **status_filter**: Filter by status (active, completed, all)
-    - **page**: Page number (default: 1)
-    - **limit**: Items per page (default: 20, max: 100)
-    - **sort_by**: Sort field
-    - **order**: Sort order (asc, desc)
-    """
-    # Validate and limit page size
-    limit = min(limit, 100)
-    skip = (page - 1) * limit
-    
-    sessions, total = crud.get_user_workout_sessions(
-        db,
-        user_id=user_id,
-        status=status_filter,
-        skip=skip,
-        limit=limit,
-        sort_by=sort_by,
-        order=order
-    )
-    
-    # Format sessions
-    sessions_data = [
-        {
-            "id": session.id,
-            "user_id": session.user_id,
-            "started_at": session.started_at,
-            "ended_at": session.ended_at,
-            "status": "active" if session.is_active else "completed",
-            "exercise": {
-                "assigned_reps": session.exercise.assigned_reps,
-                "completed_reps": session.exercise.completed_reps,
-                "exercise_name": session.exercise.exercise_name,
-                "completion_percentage": (
-                    round((session.exercise.completed_reps / session.exercise.assigned_reps) * 100, 2)
-                    if session.exercise.completed_reps is not None and session.exercise.assigned_reps > 0
-                    else None
-                )
-            }
-        }
-        for session in sessions
-    ]
-    
-    # Calculate pagination metadata
-    total_pages = math.ceil(total / limit) if total > 0 else 1
-    
-    return create_success_response(
-        data=sessions_data,
-        meta={
-            "pagination": {
-                "current_page": page,
-                "total_pages": total_pages,
-                "total_items": total,
-                "items_per_page": limit
-            }
-        },
-        request_id=getattr(request.state, "request_id", None)
-    )
-
-
-@router.get("/workouts/{session_id}", response_model=dict, status_code=status.HTTP_200_OK)
-def get_workout_session(
-    session_id: int,
-    request: Request,
-    db: Session = Depends(get_db)
-):
-    """
-    Get specific workout session details
-    
-    - **session_id**: Workout session ID
-    """
-    session = crud.get_workout_session(db, session_id)
-    
-    # Format response
-    session_data = {
-        "id": session.id,
-        "user_id": session.user_id,
-        "started_at": session.started_at,
-        "ended_at": session.ended_at,
-        "status": "active" if session.is_active else "completed",
-        "exercise": {
-            "assigned_reps": session.exercise.assigned_reps,
-            "completed_reps": session.exercise.completed_reps,
-            "exercise_name": session.exercise.exercise_name,
-            "completion_percentage": (
-                round((session.exercise.completed_reps / session.exercise.assigned_reps) * 100, 2)
-                if session.exercise.completed_reps is not None and session.exercise.assigned_reps > 0
-                else None
-            )
-        }
-    }
-    
-    return create_success_response(
-        data=session_data,
-        request_id=getattr(request.state, "request_id", None)
-    )
-
-
-@router.patch("/workouts/{session_id}/log", response_model=dict, status_code=status.HTTP_200_OK)
-def log_exercise_result(
-    session_id: int,
-    exercise_log: schemas.ExerciseLog,
-    request: Request,
-    db: Session = Depends(get_db)
-):
-    """
-    Log exercise result (reps completed)
-    
-    - **session_id**: Workout session ID
-    - **completed_reps**: Number of reps completed (non-negative)
-    """
-    session = crud.log_exercise(db, session_id, exercise_log.completed_reps)
-    
-    # Calculate completion percentage
-    completion_percentage = None
-    if session.exercise.assigned_reps > 0:
-        completion_percentage = round(
-            (session.exercise.completed_reps / session.exercise.assigned_reps) * 100, 2
-        )
-    
-    # Format response
-    response_data = {
-        "session_id": session.id,
-        "exercise": {
-            "assigned_reps": session.exercise.assigned_reps,
-            "completed_reps": session.exercise.completed_reps,
-            "completion_percentage": completion_percentage
-        }
-    }
-    
-    return create_success_response(
-        data=response_data,
-        message="Exercise logged successfully",
-        request_id=getattr(request.state, "request_id", None)
-    )
-
-
-@router.patch("/workouts/{session_id}/end", response_model=dict, status_code=status.HTTP_200_OK)
-def end_workout(
-    session_id: int,
-    request: Request,
-    db: Session = Depends(get_db)
-):
-    """
-    End workout session and calculate recommendation
-    
-    - **session_id**: Workout session ID
-    """
-    session, next_reps = crud.end_workout_session(db, session_id)
-    
-    # Calculate duration
-    duration_minutes = 0
-    if session.ended_at and session.started_at:
-        duration = session.ended_at - session.started_at
-        duration_minutes = round(duration.total_seconds() / 60, 2)
-    
-    # Determine performance
-    performance = "completed" if session.exercise.completed_reps >= session.exercise.assigned_reps else "incomplete"
-    
-    # Format response
-    response_data = {
-        "session_id": session.id,
-        "ended_at": session.ended_at,
-        "duration_minutes": duration_minutes,
-        "summary": {
-            "assigned_reps": session.exercise.assigned_reps,
-            "completed_reps": session.exercise.completed_reps,
-            "performance": performance,
-            "next_recommended_reps": next_reps
-        }
-    }
-    
-    return create_success_response(
-        data=response_data,
-        message=f"Workout completed! Next workout: {next_reps} reps",
-        request_id=getattr(request.state, "request_id", None)
-    )
+"""Workout session management endpoints"""
+import hashlib
+import orjson
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+from fastapi import APIRouter, Depends, status, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.async_db import get_async_db
+from app import cache, crud, schemas
+from app.middleware import create_success_response
+
+router = APIRouter(prefix="/api/v1", tags=["workouts"])
+
+# Pages at or below this size are cheap to materialize; larger ones are
+# streamed so TTFB and peak memory stay flat as limit grows
+_STREAM_MIN_LIMIT = 50
+
+# HATEOAS link templates, precomputed once at import
+_LOG_TMPL = "/api/v1/workouts/{}/log"
+_END_TMPL = "/api/v1/workouts/{}/end"
+
+
+@lru_cache(maxsize=128)
+def _empty_list_template(limit: int, include_total: bool) -> bytes:
+    """
+    Pre-serialized first-page-empty list envelope
+
+    The "no workouts yet" response (every new user's first fetch) is fully
+    deterministic apart from timestamp and request id, so it is encoded
+    once per (limit, include_total) and patched with two bytes.replace
+    calls per request instead of rebuilding and re-encoding the envelope.
+    """
+    pagination = {"current_page": 1, "items_per_page": limit, "next_cursor": None}
+    if include_total:
+        pagination["total_items"] = 0
+        pagination["total_pages"] = 1
+    return orjson.dumps({
+        "success": True,
+        "data": [],
+        "errors": None,
+        "meta": {
+            "timestamp": "__TS__",
+            "request_id": "__RID__",
+            "pagination": pagination
+        }
+    })
+
+
+def _completion_pct(exercise) -> Optional[float]:
+    """
+    Completion percentage for an exercise, None until reps are logged
+
+    assigned_reps > 0 is guaranteed by schema validation (gt=0) and the
+    table CHECK constraint, so the divisor needs no guard.
+    """
+    if exercise.completed_reps is None:
+        return None
+    return round(exercise.completed_reps * 100 / exercise.assigned_reps, 2)
+
+
+def _serialize_session(session) -> dict:
+    """
+    Serialize a workout session (with its exercise) to the response shape
+
+    One shared helper instead of the same nested dict rebuilt inline in
+    every endpoint — single place for the shape and the completion branch.
+    """
+    return {
+        "id": session.id,
+        "user_id": session.user_id,
+        "started_at": session.started_at,
+        "ended_at": session.ended_at,
+        "status": "active" if session.is_active else "completed",
+        "exercise": {
+            "assigned_reps": session.exercise.assigned_reps,
+            "completed_reps": session.exercise.completed_reps,
+            "exercise_name": session.exercise.exercise_name,
+            "completion_percentage": _completion_pct(session.exercise)
+        }
+    }
+
+
+@router.post("/users/{user_id}/workouts", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def start_workout(
+    user_id: int,
+    workout: schemas.WorkoutSessionCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Start a new workout session for a user
+    
+    - **user_id**: User ID
+    - **assigned_reps**: Target number of reps
+    - **exercise_name**: Optional exercise name (default: Push-ups)
+    """
+    db_session = await crud.create_workout_session(
+        db,
+        user_id=user_id,
+        assigned_reps=workout.assigned_reps,
+        exercise_name=workout.exercise_name
+    )
+    
+    # Format response (completion_percentage is None until reps are logged)
+    session_data = _serialize_session(db_session)
+
+    # Add HATEOAS links
+    links = {
+        "log": _LOG_TMPL.format(db_session.id),
+        "end": _END_TMPL.format(db_session.id)
+    }
+    
+    return create_success_response(
+        data=session_data,
+        links=links,
+        request_id=request.state.request_id,
+        timestamp=request.state.ts_iso,
+        status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.get("/users/{user_id}/workouts", response_model=dict, status_code=status.HTTP_200_OK)
+async def list_user_workouts(
+    user_id: int,
+    request: Request,
+    status_filter: str = "all",
+    page: int = 1,
+    limit: int = 20,
+    sort_by: str = "started_at",
+    order: str = "desc",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get workout history for a user
+
+    - **user_id**: User ID
+    - **status_filter**: Filter by status (active, completed, all)
+    - **page**: Page number (default: 1, ignored when cursor is given)
+    - **limit**: Items per page (default: 20, max: 100)
+    - **sort_by**: Sort field
+    - **order**: Sort order (asc, desc)
+    - **cursor**: Opaque cursor from a previous page's next_cursor (keyset mode)
+    - **include_total**: Also compute total_items/total_pages (extra scan)
+
+    Large pages are streamed: rows are serialized as they arrive from the
+    streaming cursor rather than materialized into one list first.
+    """
+    # Validate and limit page size
+    limit = min(limit, 100)
+    skip = 0 if cursor else (page - 1) * limit
+
+    if limit > _STREAM_MIN_LIMIT:
+        # Raises 404/422 for missing user or malformed cursor before streaming
+        rows, page_state, total = await crud.iter_user_workout_sessions(
+            db,
+            user_id=user_id,
+            status=status_filter,
+            skip=skip,
+            limit=limit,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+            include_total=include_total
+        )
+
+        request_id = request.state.request_id
+        timestamp = request.state.ts_iso
+
+        async def body():
+            yield b'{"success":true,"data":['
+            first = True
+            async for session in rows:
+                chunk = orjson.dumps(_serialize_session(session))
+                yield chunk if first else b"," + chunk
+                first = False
+
+            # Pagination metadata (next_cursor is known once rows are exhausted)
+            if cursor is not None:
+                pagination = {
+                    "next_cursor": page_state["next_cursor"],
+                    "items_per_page": limit
+                }
+            else:
+                pagination = {
+                    "current_page": page,
+                    "items_per_page": limit,
+                    "next_cursor": page_state["next_cursor"]
+                }
+                if total is not None:
+                    pagination["total_items"] = total
+                    pagination["total_pages"] = -(-total // limit) if total > 0 else 1
+
+            meta = {
+                "timestamp": timestamp,
+                "request_id": request_id,
+                "pagination": pagination
+            }
+            yield b'],"errors":null,"meta":' + orjson.dumps(meta) + b"}"
+
+        return StreamingResponse(body(), media_type="application/json")
+
+    # One cache variant per distinct query shape; all variants for a user
+    # hang off one Redis key so writes invalidate them together
+    variant = f"{status_filter}:{page}:{limit}:{sort_by}:{order}:{cursor}:{include_total}"
+    cached = await cache.get_user_list(user_id, variant)
+    if cached is not None:
+        sessions_data = cached["data"]
+        pagination = cached["pagination"]
+    else:
+        sessions, total, next_cursor = await crud.get_user_workout_sessions(
+            db,
+            user_id=user_id,
+            status=status_filter,
+            skip=skip,
+            limit=limit,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+            include_total=include_total
+        )
+
+        # Format sessions
+        sessions_data = [_serialize_session(session) for session in sessions]
+
+        # Calculate pagination metadata
+        if cursor is not None:
+            pagination = {
+                "next_cursor": next_cursor,
+                "items_per_page": limit
+            }
+        else:
+            pagination = {
+                "current_page": page,
+                "items_per_page": limit,
+                "next_cursor": next_cursor
+            }
+            if total is not None:
+                pagination["total_items"] = total
+                pagination["total_pages"] = -(-total // limit) if total > 0 else 1
+
+        await cache.set_user_list(user_id, variant, {"data": sessions_data, "pagination": pagination})
+
+    # Fast path for an empty first page: patch the precompiled template
+    if not sessions_data and page == 1 and cursor is None:
+        body = _empty_list_template(limit, include_total) \
+            .replace(b"__TS__", request.state.ts_iso.encode()) \
+            .replace(b"__RID__", request.state.request_id.encode())
+        return Response(content=body, media_type="application/json")
+
+    return create_success_response(
+        data=sessions_data,
+        meta={"pagination": pagination},
+        request_id=request.state.request_id,
+        timestamp=request.state.ts_iso
+    )
+
+
+@router.get("/workouts/{session_id}", response_model=dict, status_code=status.HTTP_200_OK)
+async def get_workout_session(
+    session_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get specific workout session details
+    
+    - **session_id**: Workout session ID
+
+    Sends an ETag; polling clients that present it back via If-None-Match
+    get an empty 304 while the session is unchanged.
+    """
+    session_data = await cache.get_session(session_id)
+    if session_data is None:
+        session = await crud.get_workout_session(db, session_id)
+        session_data = _serialize_session(session)
+        await cache.set_session(session_id, session_data)
+
+    # Weak ETag over the serialized payload: changes exactly when log/end
+    # mutate the session, with no extra column or query
+    payload = orjson.dumps(session_data)
+    etag = f'W/"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return create_success_response(
+        data=session_data,
+        request_id=request.state.request_id,
+        timestamp=request.state.ts_iso,
+        headers={"ETag": etag, "Cache-Control": "private, max-age=5"}
+    )
+
+
+@router.patch("/workouts/{session_id}/log", response_model=dict, status_code=status.HTTP_200_OK)
+async def log_exercise_result(
+    session_id: int,
+    exercise_log: schemas.ExerciseLog,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Log exercise result (reps completed)
+    
+    - **session_id**: Workout session ID
+    - **completed_reps**: Number of reps completed (non-negative)
+    """
+    session = await crud.log_exercise(db, session_id, exercise_log.completed_reps)
+    await cache.invalidate_session(session_id, session.user_id)
+
+    # Format response
+    response_data = {
+        "session_id": session.id,
+        "exercise": {
+            "assigned_reps": session.exercise.assigned_reps,
+            "completed_reps": session.exercise.completed_reps,
+            "completion_percentage": _completion_pct(session.exercise)
+        }
+    }
+    
+    return create_success_response(
+        data=response_data,
+        message="Exercise logged successfully",
+        request_id=request.state.request_id,
+        timestamp=request.state.ts_iso
+    )
+
+
+@router.patch("/workouts/{session_id}/complete", response_model=dict, status_code=status.HTTP_200_OK)
+async def complete_workout(
+    session_id: int,
+    exercise_log: schemas.ExerciseLog,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Log final reps and end the workout session in one call
+
+    Combines /log + /end (which remain available) into a single request and
+    database transaction for the common finish-workout flow.
+
+    - **session_id**: Workout session ID
+    - **completed_reps**: Number of reps completed (non-negative)
+    """
+    session, next_reps = await crud.complete_workout_session(
+        db, session_id, exercise_log.completed_reps
+    )
+    await cache.invalidate_session(session_id, session.user_id)
+
+    # Calculate duration (epoch arithmetic, no intermediate timedelta)
+    duration_minutes = 0
+    if session.ended_at and session.started_at:
+        duration_minutes = round(
+            (session.ended_at.timestamp() - session.started_at.timestamp()) / 60.0, 2
+        )
+
+    # Determine performance
+    performance = "completed" if session.exercise.completed_reps >= session.exercise.assigned_reps else "incomplete"
+
+    # Format response
+    response_data = {
+        "session_id": session.id,
+        "ended_at": session.ended_at,
+        "duration_minutes": duration_minutes,
+        "summary": {
+            "assigned_reps": session.exercise.assigned_reps,
+            "completed_reps": session.exercise.completed_reps,
+            "performance": performance,
+            "next_recommended_reps": next_reps
+        }
+    }
+
+    return create_success_response(
+        data=response_data,
+        message=f"Workout completed! Next workout: {next_reps} reps",
+        request_id=request.state.request_id,
+        timestamp=request.state.ts_iso
+    )
+
+
+@router.patch("/workouts/{session_id}/end", response_model=dict, status_code=status.HTTP_200_OK)
+async def end_workout(
+    session_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    End workout session and calculate recommendation
+    
+    - **session_id**: Workout session ID
+    """
+    session, next_reps = await crud.end_workout_session(db, session_id)
+    await cache.invalidate_session(session_id, session.user_id)
+
+    # Calculate duration (epoch arithmetic, no intermediate timedelta)
+    duration_minutes = 0
+    if session.ended_at and session.started_at:
+        duration_minutes = round(
+            (session.ended_at.timestamp() - session.started_at.timestamp()) / 60.0, 2
+        )
+
+    # Determine performance
+    performance = "completed" if session.exercise.completed_reps >= session.exercise.assigned_reps else "incomplete"
+    
+    # Format response
+    response_data = {
+        "session_id": session.id,
+        "ended_at": session.ended_at,
+        "duration_minutes": duration_minutes,
+        "summary": {
+            "assigned_reps": session.exercise.assigned_reps,
+            "completed_reps": session.exercise.completed_reps,
+            "performance": performance,
+            "next_recommended_reps": next_reps
+        }
+    }
+    
+    return create_success_response(
+        data=response_data,
+        message=f"Workout completed! Next workout: {next_reps} reps",
+        request_id=request.state.request_id,
+        timestamp=request.state.ts_iso
+    )
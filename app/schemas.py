@@ -1,173 +1,192 @@
-"""Pydantic schemas for request/response validation"""
-from datetime import datetime
-from typing import Optional, Any
-from pydantic import BaseModel, Field, EmailStr, field_validator
-
-
-# ============= User Schemas =============
-
-class UserCreate(BaseModel):
-    """Schema for creating a new user"""
-    name: str = Field(..., min_length=2, max_length=100, description="User's full name")
-    email: Optional[EmailStr] = Field(None, description="User's email address")
-
-
-class UserStats(BaseModel):
-    """Schema for user statistics"""
-    total_workouts: int
-    total_exercises: int
-    active_sessions: int
-    current_recommended_reps: int
-
-
-class UserResponse(BaseModel):
-    """Schema for user response"""
-    id: int
-    name: str
-    email: Optional[str]
-    created_at: datetime
-    total_workouts: Optional[int] = 0
-
-    class Config:
-        from_attributes = True
-
-
-class UserDetailResponse(BaseModel):
-    """Schema for detailed user response with stats"""
-    id: int
-    name: str
-    email: Optional[str]
-    created_at: datetime
-    stats: UserStats
-
-    class Config:
-        from_attributes = True
-
-
-# ============= Workout Session Schemas =============
-
-class WorkoutSessionCreate(BaseModel):
-    """Schema for creating a workout session"""
-    assigned_reps: int = Field(..., gt=0, description="Target number of reps")
-    exercise_name: Optional[str] = Field("Push-ups", max_length=100, description="Exercise name")
-
-
-class ExerciseData(BaseModel):
-    """Schema for exercise data within workout session"""
-    assigned_reps: int
-    completed_reps: Optional[int]
-    exercise_name: str
-    completion_percentage: Optional[float] = None
-
-    class Config:
-        from_attributes = True
-
-
-class WorkoutSessionResponse(BaseModel):
-    """Schema for workout session response"""
-    id: int
-    user_id: int
-    started_at: datetime
-    ended_at: Optional[datetime]
-    status: str
-    exercise: ExerciseData
-
-    class Config:
-        from_attributes = True
-
-
-class WorkoutSessionLinks(BaseModel):
-    """HATEOAS links for workout session"""
-    log: str
-    end: str
-
-
-# ============= Exercise Schemas =============
-
-class ExerciseLog(BaseModel):
-    """Schema for logging exercise results"""
-    completed_reps: int = Field(..., ge=0, description="Number of reps completed")
-
-
-class ExerciseLogResponse(BaseModel):
-    """Schema for exercise log response"""
-    session_id: int
-    exercise: ExerciseData
-
-
-# ============= Workout Summary Schemas =============
-
-class WorkoutSummary(BaseModel):
-    """Schema for workout summary"""
-    assigned_reps: int
-    completed_reps: int
-    performance: str
-    next_recommended_reps: int
-
-
-class WorkoutEndResponse(BaseModel):
-    """Schema for workout end response"""
-    session_id: int
-    ended_at: datetime
-    duration_minutes: float
-    summary: WorkoutSummary
-
-
-# ============= Recommendation Schemas =============
-
-class LastWorkoutInfo(BaseModel):
-    """Schema for last workout information"""
-    session_id: int
-    assigned_reps: int
-    completed_reps: int
-    date: datetime
-
-
-class ProgressionInfo(BaseModel):
-    """Schema for progression information"""
-    trend: str
-    total_increase: int
-    sessions_count: int
-
-
-class RecommendationResponse(BaseModel):
-    """Schema for recommendation response"""
-    user_id: int
-    recommended_reps: int
-    recommendation_reason: str
-    last_workout: Optional[LastWorkoutInfo]
-    progression: Optional[ProgressionInfo]
-
-
-# ============= API Response Envelope =============
-
-class PaginationMeta(BaseModel):
-    """Schema for pagination metadata"""
-    current_page: int
-    total_pages: int
-    total_items: int
-    items_per_page: int
-
-
-class ResponseMeta(BaseModel):
-    """Schema for response metadata"""
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
-    request_id: Optional[str] = None
-    pagination: Optional[PaginationMeta] = None
-
-
-class ErrorDetail(BaseModel):
-    """Schema for error details"""
-    code: str
-    message: str
-    field: Optional[str] = None
-
-
-class APIResponse(BaseModel):
-    """Standard API response envelope"""
-    success: bool
-    data: Optional[Any] = None
-    errors: Optional[list[ErrorDetail]] = None
-    meta: ResponseMeta
-    message: Optional[str] = None
-    links: Optional[dict] = None
+"""Pydantic schemas for request/response validation"""
+import re
+from datetime import datetime, timezone
+from typing import Optional, Any
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+# Shape check only (one C-level regex match); EmailStr's email-validator
+# chain with Unicode normalization is overkill for a signup field
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+# ============= User Schemas =============
+
+class UserCreate(BaseModel):
+    """Schema for creating a new user"""
+    name: str = Field(..., min_length=2, max_length=100, description="User's full name")
+    email: Optional[str] = Field(None, max_length=255, description="User's email address")
+
+    @field_validator("email")
+    @classmethod
+    def _check_email(cls, v):
+        if v and not _EMAIL_RE.match(v):
+            raise ValueError("value is not a valid email address")
+        return v
+
+
+class UserStats(BaseModel):
+    """Schema for user statistics"""
+    total_workouts: int
+    total_exercises: int
+    active_sessions: int
+    current_recommended_reps: int
+
+
+class UserResponse(BaseModel):
+    """Schema for user response"""
+    id: int
+    name: str
+    email: Optional[str]
+    created_at: datetime
+    total_workouts: Optional[int] = 0
+
+    # frozen: response models are write-once, so pydantic can skip the
+    # per-attribute setattr guards; extra keys are dropped, not validated
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
+
+class UserDetailResponse(BaseModel):
+    """Schema for detailed user response with stats"""
+    id: int
+    name: str
+    email: Optional[str]
+    created_at: datetime
+    stats: UserStats
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
+
+# ============= Workout Session Schemas =============
+
+class WorkoutSessionCreate(BaseModel):
+    """Schema for creating a workout session"""
+    assigned_reps: int = Field(..., gt=0, description="Target number of reps")
+    exercise_name: Optional[str] = Field("Push-ups", max_length=100, description="Exercise name")
+
+    @field_validator("exercise_name", mode="before")
+    @classmethod
+    def _default_name(cls, v):
+        # An explicit null also falls back to the default, so downstream
+        # code never needs an `or "Push-ups"` guard
+        return v or "Push-ups"
+
+
+class ExerciseData(BaseModel):
+    """Schema for exercise data within workout session"""
+    assigned_reps: int
+    completed_reps: Optional[int]
+    exercise_name: str
+    completion_percentage: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
+
+class WorkoutSessionResponse(BaseModel):
+    """Schema for workout session response"""
+    id: int
+    user_id: int
+    started_at: datetime
+    ended_at: Optional[datetime]
+    status: str
+    exercise: ExerciseData
+
+    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
+
+class WorkoutSessionLinks(BaseModel):
+    """HATEOAS links for workout session"""
+    log: str
+    end: str
+
+
+# ============= Exercise Schemas =============
+
+class ExerciseLog(BaseModel):
+    """Schema for logging exercise results"""
+    completed_reps: int = Field(..., ge=0, description="Number of reps completed")
+
+
+class ExerciseLogResponse(BaseModel):
+    """Schema for exercise log response"""
+    session_id: int
+    exercise: ExerciseData
+
+
+# ============= Workout Summary Schemas =============
+
+class WorkoutSummary(BaseModel):
+    """Schema for workout summary"""
+    assigned_reps: int
+    completed_reps: int
+    performance: str
+    next_recommended_reps: int
+
+
+class WorkoutEndResponse(BaseModel):
+    """Schema for workout end response"""
+    session_id: int
+    ended_at: datetime
+    duration_minutes: float
+    summary: WorkoutSummary
+
+
+# ============= Recommendation Schemas =============
+
+class LastWorkoutInfo(BaseModel):
+    """Schema for last workout information"""
+    session_id: int
+    assigned_reps: int
+    completed_reps: int
+    date: datetime
+
+
+class ProgressionInfo(BaseModel):
+    """Schema for progression information"""
+    trend: str
+    total_increase: int
+    sessions_count: int
+
+
+class RecommendationResponse(BaseModel):
+    """Schema for recommendation response"""
+    user_id: int
+    recommended_reps: int
+    recommendation_reason: str
+    last_workout: Optional[LastWorkoutInfo]
+    progression: Optional[ProgressionInfo]
+
+
+# ============= API Response Envelope =============
+
+class PaginationMeta(BaseModel):
+    """Schema for pagination metadata"""
+    current_page: Optional[int] = None
+    total_pages: Optional[int] = None
+    total_items: Optional[int] = None
+    items_per_page: int
+    next_cursor: Optional[str] = None
+
+
+class ResponseMeta(BaseModel):
+    """Schema for response metadata"""
+    # datetime.utcnow is deprecated; aware UTC also serializes with an offset
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    request_id: Optional[str] = None
+    pagination: Optional[PaginationMeta] = None
+
+
+class ErrorDetail(BaseModel):
+    """Schema for error details"""
+    code: str
+    message: str
+    field: Optional[str] = None
+
+
+class APIResponse(BaseModel):
+    """Standard API response envelope"""
+    success: bool
+    data: Optional[Any] = None
+    errors: Optional[list[ErrorDetail]] = None
+    meta: ResponseMeta
+    message: Optional[str] = None
+    links: Optional[dict] = None
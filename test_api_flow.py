@@ -1,79 +1,107 @@
-import requests
-import json
-import sys
-from datetime import datetime
-
-BASE_URL = "http://localhost:8000/api/v1"
-
-def print_step(step_name):
-    print(f"\n{'='*20} {step_name} {'='*20}")
-
-def print_response(response):
-    print(f"Status Code: {response.status_code}")
-    try:
-        print("Response:", json.dumps(response.json(), indent=2))
-    except:
-        print("Response:", response.text)
-    
-    if 200 <= response.status_code < 300:
-        print("✅ SUCCESS")
-    else:
-        print("❌ FAILED")
-        sys.exit(1)
-
-def test_api_flow():
-    # 1. Create User
-    print_step("1. Creating New User")
-    user_name = f"Test User {datetime.now().strftime('%H%M%S')}"
-    payload = {
-        "name": user_name,
-        "email": f"test{datetime.now().strftime('%H%M%S')}@example.com"
-    }
-    response = requests.post(f"{BASE_URL}/users", json=payload)
-    print_response(response)
-    user_id = response.json()['data']['id']
-
-    # 2. Start Workout
-    print_step("2. Starting Workout Session")
-    payload = {
-        "assigned_reps": 10,
-        "exercise_name": "Push-ups"
-    }
-    response = requests.post(f"{BASE_URL}/users/{user_id}/workouts", json=payload)
-    print_response(response)
-    session_id = response.json()['data']['id']
-
-    # 3. Log Exercise (Complete all reps)
-    print_step("3. Logging Exercise (10/10 reps)")
-    payload = {
-        "completed_reps": 10
-    }
-    response = requests.patch(f"{BASE_URL}/workouts/{session_id}/log", json=payload)
-    print_response(response)
-
-    # 4. End Workout
-    print_step("4. Ending Workout Session")
-    response = requests.patch(f"{BASE_URL}/workouts/{session_id}/end")
-    print_response(response)
-    
-    # Verify logic
-    next_reps = response.json()['data']['summary']['next_recommended_reps']
-    print(f"\nLogic Check: Completed 10/10 reps. Next recommended: {next_reps}")
-    if next_reps == 12:
-        print("✅ ALGORITHM VERIFIED (10 + 2 = 12)")
-    else:
-        print(f"❌ ALGORITHM FAILED (Expected 12, got {next_reps})")
-
-    # 5. Get Recommendation
-    print_step("5. Fetching Recommendation")
-    response = requests.get(f"{BASE_URL}/users/{user_id}/recommendations")
-    print_response(response)
-
-if __name__ == "__main__":
-    try:
-        test_api_flow()
-        print("\n✨ ALL API TESTS PASSED SUCCESSFULLY! ✨")
-    except requests.exceptions.ConnectionError:
-        print("\n❌ Error: Could not connect to server. Is it running on http://localhost:8000?")
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
+import asyncio
+import json
+import sys
+from datetime import datetime
+
+import httpx
+
+BASE_URL = "http://localhost:8000/api/v1"
+
+# Independent user flows driven concurrently over one pooled client
+CONCURRENT_FLOWS = 5
+
+
+def print_step(step_name):
+    print(f"\n{'='*20} {step_name} {'='*20}")
+
+
+def print_response(response):
+    print(f"Status Code: {response.status_code}")
+    try:
+        print("Response:", json.dumps(response.json(), indent=2))
+    except:
+        print("Response:", response.text)
+
+
+def expect_ok(response, verbose):
+    if verbose:
+        print_response(response)
+    if not (200 <= response.status_code < 300):
+        if verbose:
+            print("❌ FAILED")
+        raise AssertionError(f"{response.request.method} {response.request.url} -> {response.status_code}")
+    if verbose:
+        print("✅ SUCCESS")
+
+
+async def run_flow(client, flow_id):
+    # Only the first flow narrates; the rest run silently and just assert
+    verbose = flow_id == 0
+    stamp = f"{datetime.now().strftime('%H%M%S')}{flow_id}"
+
+    # 1. Create User
+    if verbose:
+        print_step("1. Creating New User")
+    payload = {
+        "name": f"Test User {stamp}",
+        "email": f"test{stamp}@example.com"
+    }
+    response = await client.post("/users", json=payload)
+    expect_ok(response, verbose)
+    user_id = response.json()['data']['id']
+
+    # 2. Start Workout
+    if verbose:
+        print_step("2. Starting Workout Session")
+    payload = {
+        "assigned_reps": 10,
+        "exercise_name": "Push-ups"
+    }
+    response = await client.post(f"/users/{user_id}/workouts", json=payload)
+    expect_ok(response, verbose)
+    session_id = response.json()['data']['id']
+
+    # 3. Complete Workout (log final reps + end in one request)
+    if verbose:
+        print_step("3. Completing Workout (10/10 reps)")
+    payload = {
+        "completed_reps": 10
+    }
+    response = await client.patch(f"/workouts/{session_id}/complete", json=payload)
+    expect_ok(response, verbose)
+
+    # Verify logic
+    next_reps = response.json()['data']['summary']['next_recommended_reps']
+    if verbose:
+        print(f"\nLogic Check: Completed 10/10 reps. Next recommended: {next_reps}")
+    if next_reps != 12:
+        raise AssertionError(f"ALGORITHM FAILED (Expected 12, got {next_reps})")
+    if verbose:
+        print("✅ ALGORITHM VERIFIED (10 + 2 = 12)")
+
+    # 4. Get Recommendation
+    if verbose:
+        print_step("4. Fetching Recommendation")
+    response = await client.get(f"/users/{user_id}/recommendations")
+    expect_ok(response, verbose)
+
+
+async def test_api_flow():
+    # One pooled client for every flow: connections are reused across
+    # requests instead of a fresh TCP handshake per call
+    limits = httpx.Limits(max_keepalive_connections=50)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=10) as client:
+        await asyncio.gather(*[
+            run_flow(client, flow_id) for flow_id in range(CONCURRENT_FLOWS)
+        ])
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(test_api_flow())
+        print(f"\n✨ ALL API TESTS PASSED SUCCESSFULLY ({CONCURRENT_FLOWS} concurrent flows)! ✨")
+    except httpx.ConnectError:
+        print("\n❌ Error: Could not connect to server. Is it running on http://localhost:8000?")
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+        sys.exit(1)